@@ -0,0 +1,49 @@
+"""
+Measures the cold start import time of the API modules.
+
+Each sample imports the module in a fresh interpreter, so nothing is cached between runs.
+Run it from the src directory:
+
+    python benchmarks/import_time.py --module main --runs 10
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import List
+
+
+def measure_import(module: str) -> float:
+    """
+    Imports a module in a new interpreter and returns the seconds it took.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        float: The import time in seconds.
+    """
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; "
+        "print(time.perf_counter() - start)"
+    )
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the cold start import time of a module.")
+    parser.add_argument("--module", default="main", help="The module to import.")
+    parser.add_argument("--runs", type=int, default=10, help="The number of fresh interpreters to use.")
+    args = parser.parse_args()
+
+    samples: List[float] = [measure_import(args.module) for _ in range(args.runs)]
+    print(f"import {args.module} ({args.runs} runs)")
+    print(f"  min:    {min(samples) * 1000:.1f} ms")
+    print(f"  median: {statistics.median(samples) * 1000:.1f} ms")
+    print(f"  max:    {max(samples) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
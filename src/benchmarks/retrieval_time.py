@@ -0,0 +1,74 @@
+"""
+Measures the local part of the retrieval used by the component generation.
+
+A synthetic partition is indexed in a temporary directory, then the time to open its index
+and to search it is measured. The Azure OpenAI embedding of the prompt and the ObjectBox
+reads of the matching chunks are not included. Run it from the src directory:
+
+    python -m benchmarks.retrieval_time --vectors 50000 --searches 200
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import List
+
+import numpy as np
+
+from utils.functions import partitions
+
+
+class SyntheticQuery:
+    """Stands in for the ObjectBox query of the synthetic partition."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def find(self):
+        return self.chunks
+
+    def count(self):
+        return len(self.chunks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the partition search latency.")
+    parser.add_argument("--vectors", type=int, default=50000, help="The number of chunks in the partition.")
+    parser.add_argument("--dimensions", type=int, default=1536, help="The dimensionality of the embeddings.")
+    parser.add_argument("--searches", type=int, default=200, help="The number of searches to time.")
+    parser.add_argument("--k", type=int, default=32, help="The number of neighbors per search.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((args.vectors, args.dimensions), dtype='float32')
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    chunks = [SimpleNamespace(id=i + 1, embedding=embedding) for i, embedding in enumerate(embeddings)]
+
+    partitions.PARTITIONS_DIR = tempfile.mkdtemp()
+    partitions.query_partition = lambda repo_name, repo_branch: SyntheticQuery(chunks)
+
+    start = time.perf_counter()
+    stats = partitions.build_partition("benchmark", "main")
+    print(f"build: {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"{stats['vectors']} vectors, {stats['nlist']} lists, {stats['index_size_bytes'] >> 20} MB")
+
+    start = time.perf_counter()
+    partitions.load_partition("benchmark", "main")
+    print(f"open:  {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    samples: List[float] = []
+    for query in rng.standard_normal((args.searches, args.dimensions), dtype='float32'):
+        start = time.perf_counter()
+        partitions.search_partition("benchmark", "main", query.tolist(), k=args.k)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    print(f"search ({args.searches} runs, k={args.k})")
+    print(f"  median: {statistics.median(samples):.2f} ms")
+    print(f"  p95:    {samples[int(len(samples) * 0.95) - 1]:.2f} ms")
+    print(f"  max:    {samples[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
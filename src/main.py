@@ -1,11 +1,39 @@
+import os
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from routes import routes
+from utils.functions.warm_up import warm_up
+
+
+async def run_warm_up() -> None:
+    """Runs the warm up in a worker thread and logs the time of each step."""
+    timings = await asyncio.to_thread(warm_up)
+    print("Warm up:", timings)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warms up the lazily loaded dependencies in the background once the API starts.
+
+    The API serves requests right away, a request arriving before the warm up finishes loads what
+    it needs itself. Set WARM_UP_ON_STARTUP=false to skip it.
+    """
+    warm_up_task = None
+    if os.getenv("WARM_UP_ON_STARTUP", "true").lower() == "true":
+        # Keep a reference so the task isn't garbage collected while it runs
+        warm_up_task = asyncio.create_task(run_warm_up())
+    yield
+    if warm_up_task is not None and not warm_up_task.done():
+        warm_up_task.cancel()
+
 
 app = FastAPI(
     title="Softtek FridaGPT Componen Generator",
     version="0.0.1",
     description="This is an API for Softtek's Extension FridaGPT's cration of components.",
+    lifespan=lifespan,
 )
 
 app.include_router(routes.router, prefix="/extension", tags=["Extension"])
@@ -18,4 +46,4 @@ async def root():
     Returns:
         dict: A dictionary with a message and a success flag.
     """
-    return {"message": "Hello World!", "success": True}
\ No newline at end of file
+    return {"message": "Hello World!", "success": True}
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException
-from utils.functions import componentGeneration, github_repo_file_decoder, object_box
+from utils.functions import componentGeneration, github_repo_file_decoder, object_box, partitions
 from utils import schemas
 
 router = APIRouter()
@@ -24,6 +24,25 @@ def generate_component(request: schemas.ComponentRequest):
         raise HTTPException(status_code=500, detail=e) from e
 
 
+@router.post('/componentGeneration/batch', description="Generate several React.js components concurrently")
+def generate_components(request: schemas.ComponentBatchRequest):
+    '''
+    Generate several React.js components concurrently
+
+    Args:
+        request: The prompts given by the user to generate each React.js component.
+
+    Returns:
+        dict: Generated components, in the same order as the prompts
+    '''
+
+    try:
+        components = componentGeneration.generateComponents(request.components, use_cache=request.use_cache)
+        return{'components': components}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
 @router.post("/search", description="Execute a search request in the Text Files.")
 async def execute_search_request(request: schemas.ChatSearchRequest):
     """
@@ -47,7 +66,7 @@ async def execute_search_request(request: schemas.ChatSearchRequest):
 
 
 @router.post("/upload-github-text-files", description="Upload text files from a GitHub repository to ObjectBox")
-async def upload_text_files_from_github(request: schemas.GitHubRepository):
+def upload_text_files_from_github(request: schemas.GitHubRepository):
     """
     Uploads text files from a GitHub repository to ObjectBox.
 
@@ -85,9 +104,82 @@ async def upload_text_files_from_github(request: schemas.GitHubRepository):
                 error_result = {"file_name": file.name, "status": "error", "error": str(e)}
                 upload_results.append(error_result)
 
+        # Rebuild the FAISS index of the repository and branch partition
+        partition = partitions.build_partition(repo_name=request.repo_name, repo_branch=request.branch)
+
         # Return the upload results
-        return {"status": "completed", "results": upload_results}
+        return {"status": "completed", "results": upload_results, "partition": partition}
 
     except Exception as e:
         # Handle any unexpected exceptions and raise an HTTP 500 error
         raise HTTPException(status_code=500, detail="Internal Server Error") from e
+
+
+@router.get("/partitions", description="List the stats of every repository and branch partition.")
+def list_partitions():
+    """
+    List the stats of every repository and branch partition.
+
+    Returns:
+        Dict[str, List[Dict]]: A dictionary containing the stats of each partition.
+    """
+    try:
+        return {"partitions": partitions.list_partitions()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal Server Error") from e
+
+
+@router.post("/partitions", description="Build the index of a repository and branch partition from its uploaded text chunks.")
+def build_partition(repo_name: str, repo_branch: str = "main"):
+    """
+    Build the index of a repository and branch partition from its uploaded text chunks.
+
+    Uploads build the index already, this is needed for chunks uploaded before partitions existed.
+
+    Args:
+        repo_name (str): The name of the repository.
+        repo_branch (str): The branch of the repository.
+
+    Returns:
+        Dict: The stats of the partition.
+    """
+    try:
+        return partitions.build_partition(repo_name=repo_name, repo_branch=repo_branch)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal Server Error") from e
+
+
+@router.get("/partitions/stats", description="Get the stats of a repository and branch partition.")
+def get_partition_stats(repo_name: str, repo_branch: str = "main"):
+    """
+    Get the stats of a repository and branch partition.
+
+    Args:
+        repo_name (str): The name of the repository.
+        repo_branch (str): The branch of the repository.
+
+    Returns:
+        Dict: The number of chunks, the indexed vectors and the size of the index on disk.
+    """
+    try:
+        return partitions.partition_stats(repo_name=repo_name, repo_branch=repo_branch)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal Server Error") from e
+
+
+@router.delete("/partitions", description="Drop every text chunk and the index of a repository and branch partition.")
+def drop_partition(repo_name: str, repo_branch: str = "main"):
+    """
+    Drop every text chunk and the index of a repository and branch partition.
+
+    Args:
+        repo_name (str): The name of the repository.
+        repo_branch (str): The branch of the repository.
+
+    Returns:
+        Dict: The partition and the number of removed chunks.
+    """
+    try:
+        return partitions.drop_partition(repo_name=repo_name, repo_branch=repo_branch)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal Server Error") from e
@@ -0,0 +1,32 @@
+from collections import OrderedDict
+
+import pytest
+
+from fakes import FakeBox, FakeQuery
+
+
+@pytest.fixture
+def partition_store(tmp_path, monkeypatch):
+    """Indexes partitions in a temporary directory from in-memory chunks keyed by (repository, branch)."""
+    pytest.importorskip("numpy")
+    pytest.importorskip("faiss")
+    pytest.importorskip("objectbox")
+    from utils.functions import partitions
+
+    chunks_by_partition = {}
+    monkeypatch.setattr(partitions, "PARTITIONS_DIR", str(tmp_path))
+    monkeypatch.setattr(partitions, "_loaded_partitions", OrderedDict())
+    monkeypatch.setattr(partitions, "query_partition",
+                        lambda repo_name, repo_branch: FakeQuery(
+                            chunks_by_partition.setdefault((repo_name, repo_branch), [])))
+    return chunks_by_partition
+
+
+@pytest.fixture
+def chunk_box(partition_store, monkeypatch):
+    """Serves the chunks of `partition_store` through `ob.get_text_chunk_box`."""
+    import utils.objectboxDB.ob as ob
+
+    box = FakeBox(partition_store)
+    monkeypatch.setattr(ob, "get_text_chunk_box", lambda: box)
+    return box
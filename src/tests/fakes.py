@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+
+class FakeQuery:
+    """Stands in for an ObjectBox query over a list of chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self._offset = 0
+        self._limit = 0
+
+    def offset(self, offset):
+        self._offset = offset
+
+    def limit(self, limit):
+        self._limit = limit
+
+    def find(self):
+        end = self._offset + self._limit if self._limit else None
+        return list(self.chunks[self._offset:end])
+
+    def count(self):
+        return len(self.chunks)
+
+    def remove(self):
+        removed = len(self.chunks)
+        self.chunks.clear()
+        return removed
+
+
+class FakeBox:
+    """Stands in for the TextChunk box, backed by the chunks of each partition."""
+
+    def __init__(self, chunks_by_partition):
+        self.chunks_by_partition = chunks_by_partition
+
+    def all_chunks(self):
+        all_chunks = []
+        for (repo_name, repo_branch), chunks in self.chunks_by_partition.items():
+            for chunk in chunks:
+                chunk.repository_name, chunk.repository_branch = repo_name, repo_branch
+                all_chunks.append(chunk)
+        return all_chunks
+
+    def get(self, chunk_id):
+        return next((chunk for chunk in self.all_chunks() if chunk.id == chunk_id), None)
+
+    def count(self):
+        return len(self.all_chunks())
+
+    def query(self, condition=None):
+        return SimpleNamespace(build=lambda: FakeQuery(self.all_chunks()))
+
+
+def fake_chunks(count, dimensions=16, seed=0, first_id=1, path="src/Component.js", text="component code"):
+    import numpy as np
+    from utils.functions.faiss_search import normalize_embedding
+
+    rng = np.random.default_rng(seed)
+    return [SimpleNamespace(id=first_id + i, embedding=normalize_embedding(rng.standard_normal(dimensions)),
+                            path=path, text=text)
+            for i in range(count)]
@@ -0,0 +1,29 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("objectbox")
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use or by the warm up, never when the API modules are imported
+LAZY_MODULES = ["faiss", "openai", "tiktoken", "github", "langchain_text_splitters"]
+
+
+@pytest.mark.parametrize("module", ["routes.routes", "main"])
+def test_import_loads_no_lazy_dependency(module):
+    code = (
+        "import json, sys\n"
+        f"import {module}\n"
+        "import utils.objectboxDB.ob as ob\n"
+        f"loaded = [name for name in {LAZY_MODULES!r} if name in sys.modules]\n"
+        "print(json.dumps({'loaded': loaded, 'store_opened': ob._store is not None}))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, check=True, capture_output=True, text=True)
+
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    assert result == {"loaded": [], "store_opened": False}
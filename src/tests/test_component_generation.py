@@ -0,0 +1,94 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from utils import schemas
+from utils.functions import componentGeneration
+
+
+class FakeClient:
+    """Stands in for the AzureOpenAI client, answering with a component named after the prompt."""
+
+    def __init__(self, failing_prompts=()):
+        self.failing_prompts = set(failing_prompts)
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages):
+        self.requests.append(messages)
+        prompt = messages[-1]["content"]
+        if prompt in self.failing_prompts:
+            raise RuntimeError(f"failed: {prompt}")
+        content = f"```\n/* File: {prompt.split()[-1]}.js */\nexport const Component = () => null;\n```"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    client = FakeClient(failing_prompts={"Create Broken"})
+    monkeypatch.setattr(componentGeneration, "get_client", lambda: client)
+    monkeypatch.setattr(componentGeneration, "_component_cache", OrderedDict())
+    return client
+
+
+def test_cache_key_normalizes_each_field():
+    key = componentGeneration.normalize_prompt
+    request = schemas.ComponentRequest
+
+    assert key(request(prompt="  Create   a DataTable ")) == key(request(prompt="Create a DataTable"))
+    assert key(request(prompt="Create a DataTable")) != key(request(prompt="Create a Datatable"))
+    assert key(request(prompt="Create a button red")) != key(request(prompt="Create a button", replaces="red"))
+    assert key(request(prompt="x", repo_name="a b", branch="main")) != \
+        key(request(prompt="main x", repo_name="a", branch="b"))
+
+
+def test_cache_returns_copies(fake_client):
+    request = schemas.ComponentRequest(prompt="Create Button")
+
+    first = componentGeneration.generateComponent(request, use_cache=True)
+    first["Component_Code"] = "changed"
+    second = componentGeneration.generateComponent(request, use_cache=True)
+
+    assert len(fake_client.requests) == 1
+    assert second["File_Name"] == "Button.js"
+    assert second["Component_Code"] != "changed"
+
+
+def test_batch_keeps_order_and_isolates_failures(fake_client):
+    prompts = [schemas.ComponentRequest(prompt=f"Create {name}") for name in ("Header", "Broken", "Footer")]
+
+    results = componentGeneration.generateComponents(prompts)
+
+    assert [result["status"] for result in results] == ["ok", "error", "ok"]
+    assert [result.get("File_Name") for result in results] == ["Header.js", None, "Footer.js"]
+    assert "failed: Create Broken" in results[1]["error"]
+
+
+def test_batch_deduplicates_normalized_prompts_with_cache(fake_client):
+    prompts = [schemas.ComponentRequest(prompt="Create Card"), schemas.ComponentRequest(prompt="  Create   Card ")]
+
+    results = componentGeneration.generateComponents(prompts, use_cache=True)
+
+    assert len(fake_client.requests) == 1
+    assert results[0] == results[1]
+    assert results[0] is not results[1]
+
+
+def test_fixed_system_messages_come_first(fake_client, monkeypatch):
+    monkeypatch.setattr(componentGeneration, "repositoryContext",
+                        lambda prompt, query_embedding=None: "context" if prompt.repo_name else None)
+
+    componentGeneration.generateComponents([
+        schemas.ComponentRequest(prompt="Create Header"),
+        schemas.ComponentRequest(prompt="Create Footer", repo_name="repo"),
+    ])
+
+    prefix = [{"role": "system", "content": componentGeneration.promptManagement},
+              {"role": "system", "content": componentGeneration.codeExample}]
+    plain, grounded = sorted(fake_client.requests, key=len)
+    assert plain[:2] == prefix and grounded[:2] == prefix
+    assert grounded[2] == {"role": "system", "content": "context"}
+    assert grounded[-1] == {"role": "user", "content": "Create Footer"}
@@ -0,0 +1,79 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("faiss")
+pytest.importorskip("objectbox")
+
+from utils import schemas
+from utils.functions import componentGeneration, object_box, partitions
+from fakes import fake_chunks
+
+
+def no_embeddings(*args, **kwargs):
+    raise AssertionError("the prompt should not be embedded")
+
+
+@pytest.fixture
+def repository(partition_store, chunk_box, monkeypatch):
+    """Indexes a repository whose first chunk is the query, with one chunk per file type."""
+    chunks = fake_chunks(12)
+    for chunk, extension in zip(chunks, [".tsx", ".py", ".js", ".jsx", ".ts", ".css"] * 2):
+        chunk.path = f"src/Component{chunk.id}{extension}"
+        chunk.text = "word " * 10
+    partition_store[("repo", "main")] = chunks
+    partitions.build_partition("repo", "main")
+
+    monkeypatch.setattr(object_box, "count_tokens", lambda prompt: len(prompt.split()))
+    monkeypatch.setattr(object_box, "generate_embeddings", no_embeddings)
+    return chunks
+
+
+def related(repository, **kwargs):
+    arguments = {"repo_name": "repo", "repo_branch": "main", "query_embedding": repository[0].embedding,
+                 "k": 8, "max_tokens": 2000, "min_score": -1.0}
+    arguments.update(kwargs)
+    return object_box.search_related_components(**arguments)
+
+
+def test_only_component_files_are_returned(repository):
+    chunks = related(repository)
+
+    assert chunks[0] is repository[0]
+    assert {chunk.path.rsplit(".", 1)[1] for chunk in chunks} == {"js", "jsx", "ts", "tsx"}
+
+
+def test_chunks_below_the_minimum_score_are_dropped(repository):
+    assert related(repository, min_score=0.99) == [repository[0]]
+
+
+def test_chunks_over_the_token_budget_are_skipped(repository):
+    repository[2].text = "word " * 100
+
+    chunks = related(repository, max_tokens=35)
+
+    assert repository[2] not in chunks
+    assert len(chunks) == 3
+
+
+def test_chunks_are_capped_at_k(repository):
+    assert len(related(repository, k=2)) == 2
+
+
+def test_partition_without_index_is_not_embedded(repository):
+    assert related(repository, repo_name="unknown", query_embedding=None) == []
+    assert object_box.search_in_text_files(repo_name="unknown", repo_branch="main", user_prompt="x") is None
+
+
+def test_repository_context_falls_back_when_retrieval_fails(monkeypatch):
+    def failing_search(**kwargs):
+        raise RuntimeError("search failed")
+
+    monkeypatch.setattr(object_box, "search_related_components", failing_search)
+
+    assert componentGeneration.repositoryContext(schemas.ComponentRequest(prompt="x", repo_name="repo")) is None
+    assert componentGeneration.repositoryContext(schemas.ComponentRequest(prompt="x")) is None
+
+
+def test_branch_cannot_be_null():
+    with pytest.raises(ValueError):
+        schemas.ComponentRequest(prompt="x", repo_name="repo", branch=None)
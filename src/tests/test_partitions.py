@@ -0,0 +1,112 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("faiss")
+pytest.importorskip("objectbox")
+
+from utils.functions import partitions
+from fakes import fake_chunks
+
+
+def test_build_search_drop_round_trip(partition_store):
+    chunks = fake_chunks(200)
+    partition_store[("repo", "main")] = chunks
+
+    # Searching never builds the index on the request path
+    assert partitions.search_partition("repo", "main", chunks[0].embedding) == []
+    assert partitions.partition_version("repo", "main") is None
+
+    stats = partitions.build_partition("repo", "main")
+    assert stats["chunks"] == 200
+    assert stats["vectors"] == 200
+    assert stats["dimensions"] == 16
+    assert stats["index_size_bytes"] > 0
+
+    # The query is not normalized, the search scores it as a cosine similarity
+    query = [value * 3 for value in chunks[7].embedding]
+    matches = partitions.search_partition("repo", "main", query, k=3)
+    assert matches[0][0] == chunks[7].id
+    assert matches[0][1] == pytest.approx(1.0, abs=1e-4)
+    assert len(matches) == 3
+
+    assert [partition["repo_name"] for partition in partitions.list_partitions()] == ["repo"]
+    assert partitions.partition_stats("repo", "main")["loaded"]
+
+    dropped = partitions.drop_partition("repo", "main")
+    assert dropped["removed_chunks"] == 200
+    assert partitions.partition_stats("repo", "main")["vectors"] == 0
+    assert partitions.search_partition("repo", "main", query, k=3) == []
+    assert partitions.list_partitions() == []
+
+
+def test_unnormalized_embeddings_are_scored_as_cosine(partition_store):
+    chunks = fake_chunks(50)
+    rng = np.random.default_rng(3)
+    for chunk in chunks:
+        chunk.embedding = [value * rng.uniform(0.5, 20) for value in chunk.embedding]
+    partition_store[("repo", "main")] = chunks
+    partitions.build_partition("repo", "main")
+
+    matches = partitions.search_partition("repo", "main", chunks[4].embedding, k=2)
+    assert matches[0][0] == chunks[4].id
+    assert matches[0][1] == pytest.approx(1.0, abs=1e-4)
+    assert matches[1][1] < 1.0
+
+
+def test_rebuild_by_another_worker_replaces_cached_index(partition_store):
+    partition_store[("repo", "main")] = fake_chunks(50, seed=1)
+    partitions.build_partition("repo", "main")
+    partitions.search_partition("repo", "main", partition_store[("repo", "main")][0].embedding)
+    key = partitions.partition_key("repo", "main")
+    stale_entry = partitions._loaded_partitions[key]
+
+    new_chunks = fake_chunks(50, seed=2, first_id=100)
+    partition_store[("repo", "main")] = new_chunks
+    partitions.build_partition("repo", "main")
+    # Another worker rebuilt the partition, this one still holds the old index
+    partitions._loaded_partitions[key] = stale_entry
+
+    matches = partitions.search_partition("repo", "main", new_chunks[3].embedding)
+    assert matches[0][0] == new_chunks[3].id
+
+
+def test_rebuild_switches_version_through_metadata(partition_store):
+    partition_store[("repo", "main")] = fake_chunks(50, seed=1)
+    first = partitions.build_partition("repo", "main")
+    partition_store[("repo", "main")] = fake_chunks(60, seed=2)
+    second = partitions.build_partition("repo", "main")
+
+    assert first["version"] != second["version"]
+    assert second["vectors"] == 60
+    directory = partitions.partition_dir("repo", "main")
+    assert sorted(os.listdir(directory)) == [f"index-{second['version']}.faiss", partitions.METADATA_FILE]
+    assert partitions.load_partition("repo", "main").ntotal == 60
+
+
+def test_partitions_are_isolated(partition_store):
+    partition_store[("repo", "main")] = fake_chunks(50, seed=1)
+    partition_store[("repo", "dev")] = fake_chunks(50, seed=2, first_id=100)
+    partitions.build_partition("repo", "main")
+    partitions.build_partition("repo", "dev")
+
+    matches = partitions.search_partition("repo", "main", partition_store[("repo", "dev")][0].embedding, k=5)
+    assert all(chunk_id < 100 for chunk_id, _ in matches)
+
+
+def test_build_missing_partitions_indexes_legacy_chunks_once(partition_store, chunk_box, monkeypatch):
+    monkeypatch.setattr(partitions, "MIGRATION_PAGE_SIZE", 7)
+    partition_store[("repo", "main")] = fake_chunks(20, seed=1)
+    partition_store[("repo", "dev")] = fake_chunks(20, seed=2, first_id=100)
+    partition_store[("other", "main")] = fake_chunks(20, seed=3, first_id=200)
+    indexed = partitions.build_partition("repo", "main")
+
+    built = partitions.build_missing_partitions()
+
+    assert [(stats["repo_name"], stats["repo_branch"]) for stats in built] == [("other", "main"), ("repo", "dev")]
+    assert partitions.partition_version("repo", "main") == indexed["version"]
+    assert len(partitions.list_partitions()) == 3
+
+    partition_store[("late", "main")] = fake_chunks(5, seed=4, first_id=300)
+    assert partitions.build_missing_partitions() == []
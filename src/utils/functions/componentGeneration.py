@@ -1,41 +1,36 @@
-from openai import AzureOpenAI
 from fastapi import HTTPException
 from dotenv import load_dotenv
 import os
 import re
-from typing import Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from utils import schemas
+from utils.functions import object_box, partitions
+from utils.functions.embeddings import get_client, generate_embeddings_batch
 
 # Load environment variables from the .env file
 load_dotenv()
-OpenAi_Key = os.getenv("OPENAI_API_KEY")
 OpenAi_Model = os.getenv("OPENAI_CHAT_MODEL_NAME")
-OpenAi_Azure_endPoint = os.getenv("OPENAI_API_BASE")
-OpenAi_ApiVersion = os.getenv("OPENAI_API_VERSION")
+Batch_Max_Workers = int(os.getenv("COMPONENT_BATCH_MAX_WORKERS", "8"))
+Cache_Max_Size = int(os.getenv("COMPONENT_CACHE_MAX_SIZE", "256"))
+Context_Max_Chunks = int(os.getenv("COMPONENT_CONTEXT_MAX_CHUNKS", "8"))
+Context_Max_Tokens = int(os.getenv("COMPONENT_CONTEXT_MAX_TOKENS", "2000"))
+Context_Min_Score = float(os.getenv("COMPONENT_CONTEXT_MIN_SCORE", "0.8"))
 
-# Create a new instance of the AzureOpenAI client
-client = AzureOpenAI(
-    azure_endpoint=OpenAi_Azure_endPoint,
-    api_key=OpenAi_Key,
-    api_version=OpenAi_ApiVersion
-)
-
-def extract_filename(content: str) -> Optional[str]:
-    # Define a regex pattern to find filenames with both comment styles
-    pattern = r'(?:/\* File:\s+|\s+// File:\s+)([\w\-]+\.js)'
-    match = re.search(pattern, content)
-    return match.group(1) if match else None
-
-def generateComponent(prompt: schemas.ComponentRequest) -> dict:
-    promptManagement = f"""
-    You are a code assistant specialized in generating React components. When you receive a {prompt.prompt} from the user, you should:
+# The system messages are kept constant and sent first so every request shares the same
+# prompt prefix. Azure OpenAI only caches prefixes of at least 1024 tokens, which these
+# messages (about 280 tokens) don't reach yet, so they only become cacheable if they grow
+promptManagement = """
+    You are a code assistant specialized in generating React components. When you receive a prompt from the user, you should:
     Generate the code for a React component based on the prompt, and use Bootstrap to give it it's styles.
     Include documentation for the code, following best practices.
     Always include a comment on the first line specifying the file name the code should have.
     Enclose the entire code block between triple backticks (```), and ensure that this format is always used.
     """
 
-    codeExample = """
+codeExample = """
     Here is an example of how you should generate the code for the component:
 
     ```
@@ -59,7 +54,91 @@ def generateComponent(prompt: schemas.ComponentRequest) -> dict:
     };
     ```
     """
-    
+
+# Generated components keyed by normalized request, least recently used first
+_component_cache: "OrderedDict[Tuple, dict]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def extract_filename(content: str) -> Optional[str]:
+    # Define a regex pattern to find filenames with both comment styles
+    pattern = r'(?:/\* File:\s+|\s+// File:\s+)([\w\-]+\.js)'
+    match = re.search(pattern, content)
+    return match.group(1) if match else None
+
+def normalize_text(text: Optional[str]) -> str:
+    """Collapses the whitespace of a text, keeping its case since component names are case-sensitive
+
+    Args:
+        text (Optional[str]): The text to normalize
+
+    Returns:
+        str: The normalized text
+    """
+    return " ".join((text or "").split())
+
+
+def normalize_prompt(prompt: schemas.ComponentRequest) -> Tuple:
+    """Builds the cache key of a component request
+
+    Each field is normalized on its own so that text moved from one field to another
+    doesn't produce the same key. The version of the partition index is part of the key,
+    so uploading or dropping the repository invalidates the components grounded on it.
+
+    Args:
+        prompt (schemas.ComponentRequest): The component request
+
+    Returns:
+        Tuple: The normalized prompt and replaces, and the repository, branch and index version used as context
+    """
+    repository = None
+    if prompt.repo_name:
+        repository = (prompt.repo_name, prompt.branch, partitions.partition_version(prompt.repo_name, prompt.branch))
+    return normalize_text(prompt.prompt), normalize_text(prompt.replaces), repository
+
+
+def repositoryContext(prompt: schemas.ComponentRequest, query_embedding: Optional[List[float]] = None) -> Optional[str]:
+    """Builds the system message with the repository components related to the prompt
+
+    Args:
+        prompt (schemas.ComponentRequest): The component request
+        query_embedding (Optional[List[float]]): The embedding of the prompt, generated if not given
+
+    Returns:
+        Optional[str]: The related components, or None if the request has no repository or none were found
+    """
+    if not prompt.repo_name:
+        return None
+
+    try:
+        chunks = object_box.search_related_components(repo_name=prompt.repo_name, repo_branch=prompt.branch,
+                                                      user_prompt=prompt.prompt, query_embedding=query_embedding,
+                                                      k=Context_Max_Chunks, max_tokens=Context_Max_Tokens,
+                                                      min_score=Context_Min_Score)
+    except Exception as e:
+        # The component can still be generated without the repository context
+        print('context error:', e)
+        return None
+
+    if not chunks:
+        return None
+
+    components = "\n\n".join(f"/* File: {chunk.path} */\n{chunk.text}" for chunk in chunks)
+    return (
+        "Here are existing components from the user's repository related to the request. "
+        "Reuse them instead of rewriting them and follow their conventions:\n\n"
+        f"{components}"
+    )
+
+
+def generateComponent(prompt: schemas.ComponentRequest, use_cache: bool = False,
+                      query_embedding: Optional[List[float]] = None) -> dict:
+    cache_key = normalize_prompt(prompt)
+    if use_cache:
+        with _cache_lock:
+            if cache_key in _component_cache:
+                _component_cache.move_to_end(cache_key)
+                return dict(_component_cache[cache_key])
+
     try:
         messages = [
             {
@@ -75,8 +154,13 @@ def generateComponent(prompt: schemas.ComponentRequest) -> dict:
                 "content": prompt.prompt
             }
         ]
+
+        # The repository context goes after the fixed system messages to keep the shared prefix
+        context = repositoryContext(prompt, query_embedding=query_embedding)
+        if context:
+            messages.insert(2, {"role": "system", "content": context})
         
-        completion = client.chat.completions.create(
+        completion = get_client().chat.completions.create(
             model=OpenAi_Model,
             messages=messages
         )
@@ -92,9 +176,56 @@ def generateComponent(prompt: schemas.ComponentRequest) -> dict:
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
-    
+
+    if use_cache:
+        with _cache_lock:
+            _component_cache[cache_key] = dict(results)
+            while len(_component_cache) > Cache_Max_Size:
+                _component_cache.popitem(last=False)
+
     return results
 
+
+def generateComponents(prompts: List[schemas.ComponentRequest], use_cache: bool = False) -> List[dict]:
+    """Generates several components concurrently
+
+    With the cache enabled, requests of the batch with the same normalized prompt share one generation.
+
+    Args:
+        prompts (List[schemas.ComponentRequest]): The component requests
+        use_cache (bool): Whether to reuse components generated for the same normalized prompt
+
+    Returns:
+        List[dict]: The status and the generated component or the error of each request, in the same order
+    """
+    keys = [normalize_prompt(prompt) if use_cache else index for index, prompt in enumerate(prompts)]
+    unique_prompts: Dict = {}
+    for key, prompt in zip(keys, prompts):
+        unique_prompts.setdefault(key, prompt)
+
+    # Embed the prompts grounded on an indexed repository with a single request
+    grounded = [prompt for key, prompt in unique_prompts.items()
+                if prompt.repo_name and partitions.partition_version(prompt.repo_name, prompt.branch) is not None
+                and not (use_cache and key in _component_cache)]
+    embeddings = {}
+    if grounded:
+        try:
+            embeddings = dict(zip(map(id, grounded), generate_embeddings_batch([prompt.prompt for prompt in grounded])))
+        except Exception as e:
+            # Each component falls back to embedding its own prompt
+            print('embeddings error:', e)
+
+    def generate(prompt: schemas.ComponentRequest) -> dict:
+        try:
+            component = generateComponent(prompt, use_cache=use_cache, query_embedding=embeddings.get(id(prompt)))
+            return {"status": "ok", **component}
+        except HTTPException as e:
+            return {"status": "error", "error": e.detail}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(Batch_Max_Workers, len(unique_prompts)))) as executor:
+        results = dict(zip(unique_prompts.keys(), executor.map(generate, unique_prompts.values())))
+    return [dict(results[key]) for key in keys]
+
 '''
 {
   "prompt": "Create a React component called ButtonComponent that displays a button with the text \"Click Me\". The component should handle a click event that logs \"Button clicked!\" to the console. Include appropriate comments and documentation for the component.",
@@ -1,39 +1,56 @@
-from openai import AzureOpenAI
 from dotenv import load_dotenv
 import os
-from langchain_text_splitters import (
-    Language,
-    RecursiveCharacterTextSplitter,
-    CharacterTextSplitter
-)
+from functools import lru_cache
 from fastapi import HTTPException
-import tiktoken
-from typing import List, Dict, Tuple
+from typing import TYPE_CHECKING, List, Dict, Tuple
+
+if TYPE_CHECKING:
+    import tiktoken
+    from openai import AzureOpenAI
 
 load_dotenv(".env")
 
+# Values of langchain's Language enum, resolved when a file is split
 languages = {
-    ".py": Language.PYTHON,
-    ".js": Language.JS,
-    ".java": Language.JAVA,
-    ".ts": Language.TS,
-    ".tsx": Language.TS,
-    ".swift": Language.SWIFT,
-    ".cpp": Language.CPP,
-    ".c": Language.C,
-    ".go": Language.GO,
-    ".html": Language.HTML,
-    ".php": Language.PHP,
-    ".kt": Language.KOTLIN,
+    ".py": "python",
+    ".js": "js",
+    ".java": "java",
+    ".ts": "ts",
+    ".tsx": "ts",
+    ".swift": "swift",
+    ".cpp": "cpp",
+    ".c": "c",
+    ".go": "go",
+    ".html": "html",
+    ".php": "php",
+    ".kt": "kotlin",
 }
 
-tokenizer = tiktoken.get_encoding("cl100k_base")
 
-client = AzureOpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"),
-    api_version=os.getenv("OPENAI_API_VERSION"),
-    azure_endpoint=os.getenv("OPENAI_API_BASE"),
-)
+@lru_cache(maxsize=None)
+def get_tokenizer() -> "tiktoken.Encoding":
+    """Loads the cl100k_base encoding the first time it is needed
+
+    Returns:
+        tiktoken.Encoding: The tokenizer
+    """
+    import tiktoken
+    return tiktoken.get_encoding("cl100k_base")
+
+
+@lru_cache(maxsize=None)
+def get_client() -> "AzureOpenAI":
+    """Creates the AzureOpenAI client the first time it is needed
+
+    Returns:
+        AzureOpenAI: The client
+    """
+    from openai import AzureOpenAI
+    return AzureOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        api_version=os.getenv("OPENAI_API_VERSION"),
+        azure_endpoint=os.getenv("OPENAI_API_BASE"),
+    )
 
 
 def count_tokens(prompt: str) -> int:
@@ -45,8 +62,7 @@ def count_tokens(prompt: str) -> int:
     Returns:
         int: Number of tokens in the prompt
     """
-    encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(prompt))
+    return len(get_tokenizer().encode(prompt))
 
 
 # Function to generate embeddings for the given text using a specified model
@@ -61,7 +77,22 @@ def generate_embeddings(text: str = "", model: str = "OpenAIEmbeddings") -> List
     Returns:
         str: The embedding data of the input text based on the specified model.
     """
-    return client.embeddings.create(input=[text], model=model).data[0].embedding
+    return get_client().embeddings.create(input=[text], model=model).data[0].embedding
+
+
+def generate_embeddings_batch(texts: List[str], model: str = "OpenAIEmbeddings") -> List[List[float]]:
+    """
+    Generate embeddings for several input texts with a single request.
+
+    Args:
+        texts (List[str]): The input texts for which embeddings are generated.
+        model (str): The model to use for generating embeddings.
+
+    Returns:
+        List[List[float]]: The embedding of each input text, in the same order.
+    """
+    data = get_client().embeddings.create(input=texts, model=model).data
+    return [item.embedding for item in sorted(data, key=lambda item: item.index)]
 
 
 def generate_code_context(code_segment: str = "", file_name: str = "") -> Dict:
@@ -80,7 +111,7 @@ def generate_code_context(code_segment: str = "", file_name: str = "") -> Dict:
     """
 
     # Requesting the OpenAI API to generate a description of the code segment
-    response = client.chat.completions.create(
+    response = get_client().chat.completions.create(
         model=os.getenv("OPENAI_CHAT_MODEL_NAME"),
         messages=[
             {
@@ -125,7 +156,7 @@ def generate_response(query: str = "", code_segment: str = "", file_name: str =
     Returns:
     - response: The generated response from the OpenAI API.
     """
-    response = client.chat.completions.create(
+    response = get_client().chat.completions.create(
         model=os.getenv("OPENAI_CHAT_MODEL_NAME"),
         messages=[
             {
@@ -163,6 +194,7 @@ def unsupported_extension(file_name: str = "", file_content: str = "", file_path
     if tokens < 1500:
         return [(file_name, file_content, file_path)]
     else:
+        from langchain_text_splitters import CharacterTextSplitter
         content_splitter = CharacterTextSplitter.from_tiktoken_encoder(
             encoding="cl100k_base", chunk_size=1500, chunk_overlap=100
         )
@@ -204,8 +236,9 @@ def splitter(file_name: str = "", file_content: str = "",
                 return unsupported_extension(file_name=file_name, file_content=file_content, file_path=file_path)
 
         # Create a text splitter based on the file extension
+        from langchain_text_splitters import Language, RecursiveCharacterTextSplitter
         code_splitter = RecursiveCharacterTextSplitter.from_language(
-            language=languages[file_extension], chunk_size=900, chunk_overlap=100
+            language=Language(languages[file_extension]), chunk_size=900, chunk_overlap=100
         )
 
         all_splitters = []
@@ -1,52 +1,79 @@
-import faiss
-from faiss.swigfaiss_avx2 import IndexFlatL2
 import numpy as np
-from typing import List
+from functools import lru_cache
+from typing import TYPE_CHECKING, List
 
+if TYPE_CHECKING:
+    import faiss
 
-def create_faiss_index(dimensions: int = 1536) -> IndexFlatL2:
+
+@lru_cache(maxsize=None)
+def get_faiss():
+    """
+    Imports FAISS on first use to keep it out of the API start up.
+
+    The faiss loader picks the AVX2 build when the CPU supports it and falls back to the
+    generic build otherwise, so the AVX2 module is not imported directly.
+
+    Returns:
+        module: The faiss module.
+    """
+    import faiss
+    return faiss
+
+
+def create_faiss_index(dimensions: int = 1536) -> "faiss.Index":
     """
-    Creates a FAISS index for L2 distance (Euclidean distance).
+    Creates a FAISS index for inner product similarity.
+
+    The stored embeddings are L2-normalized at ingestion time, so the inner product
+    is equal to the cosine similarity used by the ObjectBox HNSW index.
 
     Args:
         dimensions (int): The dimensionality of the vectors to be indexed.
 
     Returns:
-        IndexFlatL2: The FAISS index object.
+        faiss.Index: The FAISS index object.
     """
-    return faiss.IndexFlatL2(dimensions)
+    return get_faiss().IndexFlatIP(dimensions)
 
 
-def add_embeddings_to_index(index: IndexFlatL2, embeddings_array: np.ndarray) -> None:
+def create_ivf_index(dimensions: int = 1536, nlist: int = 1) -> "faiss.Index":
     """
-    Adds embeddings to the FAISS index.
+    Creates an inverted file FAISS index for inner product similarity.
+
+    Unlike the flat index, the vectors of an inverted file index live in its inverted lists,
+    which `faiss.read_index` can memory map with `faiss.IO_FLAG_MMAP` instead of reading them into RAM.
+    The index must be trained before adding embeddings.
 
     Args:
-        index (IndexFlatL2): The FAISS index object.
-        embeddings_array (np.ndarray): The array of embeddings to add.
+        dimensions (int): The dimensionality of the vectors to be indexed.
+        nlist (int): The number of inverted lists (clusters).
+
+    Returns:
+        faiss.Index: The FAISS index object.
     """
-    index.add(embeddings_array)
+    faiss = get_faiss()
+    index = faiss.IndexIVFFlat(create_faiss_index(dimensions), dimensions, nlist, faiss.METRIC_INNER_PRODUCT)
+    # The embeddings are normalized, so cluster them on the unit sphere
+    index.cp.spherical = True
+    return index
 
 
-def search_embeddings(embeddings: List[List[float]], query_embedding: List[float], k: int = 1) -> List[List[int]]:
+def normalize_embedding(embedding: List[float]) -> List[float]:
     """
-    Searches for the nearest neighbors of a query embedding in the FAISS index.
+    Scales an embedding to unit length so that inner product equals cosine similarity.
 
     Args:
-        embeddings (List[List[float]]): List of embeddings to be indexed.
-        query_embedding (List[float]): The query embedding to search for.
-        k (int): The number of nearest neighbors to return.
+        embedding (List[float]): The embedding to normalize.
 
     Returns:
-        List[List[int]]: List of indices of the nearest neighbors.
-    """
-    embeddings_array = prepare_embeddings_array(embeddings)
-    index = create_faiss_index(dimensions=embeddings_array.shape[1])
-    add_embeddings_to_index(index=index, embeddings_array=embeddings_array)
-    query_array = np.array([query_embedding], dtype='float32')
-    _, result_indices = index.search(query_array, k)
-    index.reset()  # TODO: Reset only if needed
-    return result_indices
+        List[float]: The normalized embedding.
+    """
+    embedding_array = np.asarray(embedding, dtype='float32')
+    norm = np.linalg.norm(embedding_array)
+    if norm == 0:
+        return embedding_array.tolist()
+    return (embedding_array / norm).tolist()
 
 
 def prepare_embeddings_array(embeddings: List[List[float]]) -> np.ndarray:
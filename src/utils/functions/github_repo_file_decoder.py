@@ -1,8 +1,10 @@
-from github import Auth, Github, Repository
 import base64
-from typing import List
+from typing import TYPE_CHECKING, List
 from pydantic import BaseModel
 
+if TYPE_CHECKING:
+    from github import Repository
+
 
 class File(BaseModel):
     """
@@ -13,7 +15,7 @@ class File(BaseModel):
     path: str = ""
 
 
-def connect_to_repo(repo_name: str, token: str) -> Repository.Repository:
+def connect_to_repo(repo_name: str, token: str) -> "Repository.Repository":
     """
     Connects to a GitHub repository.
 
@@ -24,6 +26,9 @@ def connect_to_repo(repo_name: str, token: str) -> Repository.Repository:
     Returns:
         Repository.Repository: The GitHub repository.
     """
+    # PyGithub is only imported when a repository is uploaded
+    from github import Auth, Github
+
     auth = Auth.Token(token)
     github_instance = Github(base_url="https://api.github.com", auth=auth)
     user = github_instance.get_user()
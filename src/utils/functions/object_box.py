@@ -1,7 +1,12 @@
+import time
 import utils.objectboxDB.ob as ob
-from utils.functions.faiss_search import search_embeddings
+from utils.functions.faiss_search import normalize_embedding
+from utils.functions.partitions import search_partition, partition_version
 from typing import List, Dict, Tuple
-from utils.functions.embeddings import splitter, generate_embeddings, generate_response
+from utils.functions.embeddings import splitter, generate_embeddings, generate_response, count_tokens
+
+# Extensions of the files that can contain components reusable by the component generation
+component_extensions = (".js", ".jsx", ".ts", ".tsx")
 
 
 def upload_text_file_to_objectbox(file_name: str = "", file_text: str = "",
@@ -46,7 +51,8 @@ def upload_text_file_to_objectbox(file_name: str = "", file_text: str = "",
                     chunk_context = chunk[0]["Explanation"]
                 chunk_text = chunk[1]
                 chunk_path = chunk[2]
-                chunk_embedding = chunk[3]
+                # Normalize once at ingestion so searches only need a dot product
+                chunk_embedding = normalize_embedding(chunk[3])
 
                 # Create a TextChunk object with the chunk data
                 text_file_chunk = ob.TextChunk(
@@ -60,7 +66,7 @@ def upload_text_file_to_objectbox(file_name: str = "", file_text: str = "",
                 )
 
                 # Store the chunk in ObjectBox
-                ob.text_chunk.put(text_file_chunk)
+                ob.get_text_chunk_box().put(text_file_chunk)
 
                 # Append the success result for the chunk
                 upload_results.append({"file_name": chunk_name, "status": "uploaded", "content": chunk_text})
@@ -78,7 +84,7 @@ def upload_text_file_to_objectbox(file_name: str = "", file_text: str = "",
     return upload_results
 
 
-def search_in_text_files(repo_name: str = "", repo_branch: str = "main", user_prompt: str = ""):
+def search_in_text_files(repo_name: str = "", repo_branch: str = "main", user_prompt: str = "") -> Dict | None:
     """
     This function returns the most relevant document to the user prompt through embedding
     using the 'text-embedding-ada-002' model from OpenAI and limits the results to 1.
@@ -89,40 +95,113 @@ def search_in_text_files(repo_name: str = "", repo_branch: str = "main", user_pr
         user_prompt (str): The prompt provided by the user.
 
     Returns:
-        str: The most relevant document to the user prompt.
+        Dict | None: The most relevant document to the user prompt with its cosine similarity
+            score and the generated response, or None if there are no documents to search.
 
     Note:
         The function is still in progress and not yet complete.
-        Currently, it filters text chunks by repository name and branch,
-        generates embeddings using Azure OpenAI, and performs FAISS search.
+        Currently, it searches the FAISS index of the repository and branch partition,
+        generates embeddings using Azure OpenAI, and loads only the matching TextChunk.
         It also generates partial responses using Azure OpenAI and Ollama models.
     """
+    # Skip the embedding round trip when the partition has no index
+    if partition_version(repo_name, repo_branch) is None:
+        return None
+
     # Generate an embedding for the prompt and retrieve the most relevant doc
-    if len(ob.text_chunk.get_all()) > 0:
+    if ob.get_text_chunk_box().count() > 0:
         # embedding = embedding_response(content=user_prompt)
         embedding_openai = generate_embeddings(user_prompt)
 
-        # Filter by repository name and branch name
-        query_filter = ob.text_chunk.query(ob.TextChunk.repository_name.equals(repo_name) &
-                                           ob.TextChunk.repository_branch.equals(repo_branch)).build()
-        query_results = query_filter.find()
-
-        # Prepare data
-        query_embeddings = [query_result.embedding for query_result in query_results]
+        # FAISS search of the most similar TextChunk to the user prompt within the partition
+        matches = search_partition(repo_name=repo_name, repo_branch=repo_branch,
+                                   query_embedding=embedding_openai, k=1)
+        if not matches:
+            return None
 
-        # FAISS search of the most similar TextChunk to the user prompt
-        index_closer = search_embeddings(embeddings=query_embeddings, query_embedding=embedding_openai,
-                                         k=1)
-
-        result = query_results[index_closer[0][0]]
+        chunk_id, score = matches[0]
+        result = ob.get_text_chunk_box().get(chunk_id)
+        if result is None:
+            # The chunk was removed after the partition index was read
+            return None
 
         print("Repo name: ", result.repository_name)
         print("Repo branch: ", result.repository_branch)
         print("File Name: ", result.file_name)
         print("File Path: ", result.path)
+        print("Score: ", score)
         print("File content", result.text)
 
         # OPENAI response
         response = generate_response(query=user_prompt, code_segment=result.text,
                                      file_name=result.file_name)
         print(response.choices[0].message.content)
+
+        return {
+            "file_name": result.file_name,
+            "path": result.path,
+            "text": result.text,
+            "score": score,
+            "response": response.choices[0].message.content,
+        }
+    return None
+
+
+def search_related_components(repo_name: str = "", repo_branch: str = "main", user_prompt: str = "",
+                              query_embedding: List[float] | None = None, k: int = 8,
+                              max_tokens: int = 2000, min_score: float = 0.0) -> List[ob.TextChunk]:
+    """
+    Returns the component chunks of a repository most related to the user prompt.
+
+    The search runs over the FAISS index of the repository and branch partition, keeps only
+    the chunks of component files similar enough to the prompt and stops once the token budget
+    is reached. Partitions without an index are skipped without requesting an embedding.
+
+    Args:
+        repo_name (str): The repository name for the search.
+        repo_branch (str): The repository branch for the search.
+        user_prompt (str): The prompt provided by the user.
+        query_embedding (List[float] | None): The embedding of the prompt, generated if not given.
+        k (int): The maximum number of chunks to return.
+        max_tokens (int): The maximum number of tokens of the returned chunks.
+        min_score (float): The minimum cosine similarity of the returned chunks.
+
+    Returns:
+        List[ob.TextChunk]: The related chunks, most similar first.
+    """
+    if partition_version(repo_name, repo_branch) is None:
+        return []
+
+    start = time.perf_counter()
+    if query_embedding is None:
+        query_embedding = generate_embeddings(user_prompt)
+    embedded = time.perf_counter()
+
+    # Search more candidates than needed since the chunks of other files are discarded
+    matches = search_partition(repo_name=repo_name, repo_branch=repo_branch,
+                               query_embedding=query_embedding, k=k * 4)
+    searched = time.perf_counter()
+
+    related_chunks: List[ob.TextChunk] = []
+    used_tokens = 0
+    for chunk_id, score in matches:
+        # The matches are sorted by score, the rest are less similar
+        if score < min_score:
+            break
+
+        chunk = ob.get_text_chunk_box().get(chunk_id)
+        if chunk is None or not chunk.path.endswith(component_extensions):
+            continue
+
+        chunk_tokens = count_tokens(prompt=chunk.text)
+        if used_tokens + chunk_tokens > max_tokens:
+            continue
+
+        related_chunks.append(chunk)
+        used_tokens += chunk_tokens
+        if len(related_chunks) >= k:
+            break
+
+    print(f"Retrieval: embedding {(embedded - start) * 1000:.1f} ms, search {(searched - embedded) * 1000:.1f} ms, "
+          f"fetch {(time.perf_counter() - searched) * 1000:.1f} ms, {len(related_chunks)} chunks")
+    return related_chunks
@@ -0,0 +1,366 @@
+import numpy as np
+import os
+import re
+import json
+import uuid
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Dict, Tuple
+import utils.objectboxDB.ob as ob
+from utils.functions.faiss_search import get_faiss, create_ivf_index, prepare_embeddings_array, normalize_embedding
+
+if TYPE_CHECKING:
+    import faiss
+
+# Directory where each (repository, branch) partition keeps its FAISS index
+PARTITIONS_DIR = os.getenv("FAISS_PARTITIONS_DIR", "faiss_partitions")
+
+# Maximum number of partition indexes kept open at the same time
+MAX_LOADED_PARTITIONS = int(os.getenv("FAISS_MAX_LOADED_PARTITIONS", "16"))
+
+# Number of inverted lists visited per search, partitions with fewer lists are searched exhaustively
+NPROBE = int(os.getenv("FAISS_NPROBE", "16"))
+
+# The metadata file names the index file of the current version, replacing it is the only
+# step that switches a partition to a new version
+METADATA_FILE = "metadata.json"
+
+# Marks that the chunks uploaded before partitions existed have been indexed
+MIGRATION_FILE = ".migrated"
+
+# Number of chunks read at a time when looking for partitions without an index
+MIGRATION_PAGE_SIZE = 1000
+
+# Open partition indexes with the version they were read from, least recently used first
+_loaded_partitions: "OrderedDict[str, Tuple[str, faiss.Index]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def partition_key(repo_name: str, repo_branch: str) -> str:
+    """
+    Builds a filesystem safe identifier for a (repository, branch) partition.
+
+    Args:
+        repo_name (str): The name of the repository.
+        repo_branch (str): The branch of the repository.
+
+    Returns:
+        str: The partition identifier.
+    """
+    slug = re.sub(r"[^\w\-.]+", "_", f"{repo_name}__{repo_branch}")[:80]
+    digest = hashlib.sha1(f"{repo_name}\0{repo_branch}".encode("utf-8")).hexdigest()[:12]
+    return f"{slug}-{digest}"
+
+
+def partition_dir(repo_name: str, repo_branch: str) -> str:
+    """
+    Returns the directory where the partition index is persisted.
+
+    Args:
+        repo_name (str): The name of the repository.
+        repo_branch (str): The branch of the repository.
+
+    Returns:
+        str: The partition directory.
+    """
+    return os.path.join(PARTITIONS_DIR, partition_key(repo_name, repo_branch))
+
+
+def query_partition(repo_name: str, repo_branch: str):
+    """
+    Builds an ObjectBox query for the text chunks of a partition.
+
+    Args:
+        repo_name (str): The name of the repository.
+        repo_branch (str): The branch of the repository.
+
+    Returns:
+        Query: The ObjectBox query.
+    """
+    return ob.get_text_chunk_box().query(ob.TextChunk.repository_name.equals(repo_name) &
+                                         ob.TextChunk.repository_branch.equals(repo_branch)).build()
+
+
+def partition_version(repo_name: str, repo_branch: str) -> str | None:
+    """
+    Returns the version of the partition index on disk.
+
+    Every rebuild writes a new version, so it changes even when the rebuild was done
+    by another worker process.
+
+    Args:
+        repo_name (str): The name of the repository.
+        repo_branch (str): The branch of the repository.
+
+    Returns:
+        str | None: The version of the index, or None if the partition has no index.
+    """
+    return _read_metadata(partition_dir(repo_name, repo_branch)).get("version")
+
+
+def build_partition(repo_name: str, repo_branch: str) -> Dict:
+    """
+    (Re)builds the FAISS index of a partition from its ObjectBox text chunks and persists it to disk.
+
+    The index maps the FAISS results directly to the ObjectBox ids of the chunks, so a search
+    only needs to fetch the matching chunks instead of every chunk of the repository.
+
+    Args:
+        repo_name (str): The name of the repository.
+        repo_branch (str): The branch of the repository.
+
+    Returns:
+        Dict: The stats of the partition.
+    """
+    faiss = get_faiss()
+    chunks = query_partition(repo_name, repo_branch).find()
+    key = partition_key(repo_name, repo_branch)
+    directory = partition_dir(repo_name, repo_branch)
+
+    if not chunks:
+        with _lock:
+            _loaded_partitions.pop(key, None)
+            shutil.rmtree(directory, ignore_errors=True)
+        return partition_stats(repo_name, repo_branch)
+
+    embeddings_array = prepare_embeddings_array([chunk.embedding for chunk in chunks])
+    ids_array = np.array([chunk.id for chunk in chunks], dtype='int64')
+    # Chunks uploaded before embeddings were normalized at ingestion are stored unnormalized
+    faiss.normalize_L2(embeddings_array)
+
+    # Roughly sqrt(n) lists, keeping enough training points per list for small partitions
+    nlist = max(1, min(4096, int(np.sqrt(len(chunks))), len(chunks) // 39))
+    index = create_ivf_index(dimensions=embeddings_array.shape[1], nlist=nlist)
+    index.train(embeddings_array)
+    index.add_with_ids(embeddings_array, ids_array)
+
+    version = uuid.uuid4().hex
+    metadata = {
+        "repo_name": repo_name,
+        "repo_branch": repo_branch,
+        "version": version,
+        "index_file": f"index-{version}.faiss",
+        "dimensions": int(embeddings_array.shape[1]),
+        "vectors": int(index.ntotal),
+        "nlist": nlist,
+    }
+
+    # The index file is new, only the metadata replaces the previous version
+    os.makedirs(directory, exist_ok=True)
+    faiss.write_index(index, os.path.join(directory, metadata["index_file"]))
+    metadata_path = os.path.join(directory, METADATA_FILE)
+    with open(f"{metadata_path}.{version}.tmp", "w", encoding="utf-8") as metadata_file:
+        json.dump(metadata, metadata_file)
+
+    with _lock:
+        os.replace(f"{metadata_path}.{version}.tmp", metadata_path)
+        _loaded_partitions.pop(key, None)
+
+    # Remove the previous versions, an index still memory mapped elsewhere keeps working on POSIX
+    for file_name in os.listdir(directory):
+        if file_name.startswith("index-") and file_name != metadata["index_file"]:
+            try:
+                os.remove(os.path.join(directory, file_name))
+            except OSError:
+                pass
+
+    return partition_stats(repo_name, repo_branch)
+
+
+def build_missing_partitions() -> List[Dict]:
+    """
+    Builds the index of every partition that has text chunks in ObjectBox but no index on disk.
+
+    Chunks uploaded before partitions existed have no index, so this runs once on start up and
+    leaves a marker file behind. Later uploads build their partition themselves.
+
+    Returns:
+        List[Dict]: The stats of each partition built.
+    """
+    migration_path = os.path.join(PARTITIONS_DIR, MIGRATION_FILE)
+    if os.path.exists(migration_path):
+        return []
+
+    # Read the chunks a page at a time, only their repository and branch are kept
+    query = ob.get_text_chunk_box().query().build()
+    repositories = set()
+    offset = 0
+    while True:
+        query.offset(offset)
+        query.limit(MIGRATION_PAGE_SIZE)
+        page = query.find()
+        repositories.update((chunk.repository_name, chunk.repository_branch) for chunk in page)
+        if len(page) < MIGRATION_PAGE_SIZE:
+            break
+        offset += MIGRATION_PAGE_SIZE
+
+    built = [build_partition(repo_name, repo_branch) for repo_name, repo_branch in sorted(repositories)
+             if partition_version(repo_name, repo_branch) is None]
+
+    os.makedirs(PARTITIONS_DIR, exist_ok=True)
+    with open(migration_path, "w", encoding="utf-8") as migration_file:
+        json.dump({"built": len(built)}, migration_file)
+    return built
+
+
+def load_partition(repo_name: str, repo_branch: str) -> "faiss.Index | None":
+    """
+    Returns the FAISS index of a partition, reading it from disk the first time it is used.
+
+    The inverted lists holding the vectors are memory mapped, so only the cluster centroids
+    are loaded into RAM. A cached index is read again when the partition has a new version.
+    Partitions are never built here, that happens on upload, on start up (`build_missing_partitions`)
+    or through `build_partition`.
+
+    Args:
+        repo_name (str): The name of the repository.
+        repo_branch (str): The branch of the repository.
+
+    Returns:
+        faiss.Index | None: The partition index, or None if the partition has no index on disk.
+    """
+    faiss = None
+    key = partition_key(repo_name, repo_branch)
+    directory = partition_dir(repo_name, repo_branch)
+
+    # A rebuild in another process may remove the index file between reading the metadata
+    # and opening it, the metadata is then read again
+    for _ in range(3):
+        metadata = _read_metadata(directory)
+        version = metadata.get("version")
+        with _lock:
+            cached = _loaded_partitions.get(key)
+            if cached is not None and cached[0] == version:
+                _loaded_partitions.move_to_end(key)
+                return cached[1]
+            _loaded_partitions.pop(key, None)
+
+        if version is None:
+            return None
+
+        index_path = os.path.join(directory, metadata["index_file"])
+        if not os.path.exists(index_path):
+            continue
+
+        faiss = faiss or get_faiss()
+        try:
+            index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP)
+        except RuntimeError:
+            continue
+        index.nprobe = NPROBE
+        with _lock:
+            _loaded_partitions[key] = (version, index)
+            while len(_loaded_partitions) > MAX_LOADED_PARTITIONS:
+                _loaded_partitions.popitem(last=False)
+        return index
+
+    return None
+
+
+def search_partition(repo_name: str, repo_branch: str, query_embedding: List[float],
+                     k: int = 1) -> List[Tuple[int, float]]:
+    """
+    Searches the nearest text chunks of a partition to a query embedding.
+
+    Args:
+        repo_name (str): The name of the repository.
+        repo_branch (str): The branch of the repository.
+        query_embedding (List[float]): The query embedding to search for.
+        k (int): The number of nearest neighbors to return.
+
+    Returns:
+        List[Tuple[int, float]]: The ObjectBox ids of the nearest chunks with their cosine similarity scores.
+    """
+    index = load_partition(repo_name, repo_branch)
+    if index is None or index.ntotal == 0:
+        return []
+
+    query_array = prepare_embeddings_array([normalize_embedding(query_embedding)])
+    scores, ids = index.search(query_array, min(k, index.ntotal))
+    return [(int(chunk_id), float(score)) for chunk_id, score in zip(ids[0], scores[0]) if chunk_id != -1]
+
+
+def drop_partition(repo_name: str, repo_branch: str) -> Dict:
+    """
+    Removes every text chunk of a partition from ObjectBox along with its FAISS index.
+
+    Args:
+        repo_name (str): The name of the repository.
+        repo_branch (str): The branch of the repository.
+
+    Returns:
+        Dict: The partition and the number of removed chunks.
+    """
+    removed_chunks = query_partition(repo_name, repo_branch).remove()
+    with _lock:
+        _loaded_partitions.pop(partition_key(repo_name, repo_branch), None)
+        shutil.rmtree(partition_dir(repo_name, repo_branch), ignore_errors=True)
+
+    return {"repo_name": repo_name, "repo_branch": repo_branch, "removed_chunks": removed_chunks}
+
+
+def partition_stats(repo_name: str, repo_branch: str) -> Dict:
+    """
+    Returns the stats of a partition.
+
+    Args:
+        repo_name (str): The name of the repository.
+        repo_branch (str): The branch of the repository.
+
+    Returns:
+        Dict: The number of chunks, the indexed vectors and the size of the index on disk.
+    """
+    directory = partition_dir(repo_name, repo_branch)
+    metadata = _read_metadata(directory)
+    index_path = os.path.join(directory, metadata.get("index_file", ""))
+
+    return {
+        "repo_name": repo_name,
+        "repo_branch": repo_branch,
+        "chunks": query_partition(repo_name, repo_branch).count(),
+        "vectors": metadata.get("vectors", 0),
+        "dimensions": metadata.get("dimensions"),
+        "nlist": metadata.get("nlist"),
+        "version": metadata.get("version"),
+        "index_size_bytes": os.path.getsize(index_path) if os.path.isfile(index_path) else 0,
+        "loaded": partition_key(repo_name, repo_branch) in _loaded_partitions,
+    }
+
+
+def list_partitions() -> List[Dict]:
+    """
+    Returns the stats of every partition persisted to disk.
+
+    Returns:
+        List[Dict]: The stats of each partition.
+    """
+    if not os.path.isdir(PARTITIONS_DIR):
+        return []
+
+    partitions: List[Dict] = []
+    for key in sorted(os.listdir(PARTITIONS_DIR)):
+        if key == MIGRATION_FILE:
+            continue
+        metadata = _read_metadata(os.path.join(PARTITIONS_DIR, key))
+        if metadata:
+            partitions.append(partition_stats(metadata["repo_name"], metadata["repo_branch"]))
+    return partitions
+
+
+def _read_metadata(directory: str) -> Dict:
+    """
+    Reads the metadata file of a partition directory.
+
+    Args:
+        directory (str): The partition directory.
+
+    Returns:
+        Dict: The partition metadata, empty if it does not exist.
+    """
+    try:
+        with open(os.path.join(directory, METADATA_FILE), encoding="utf-8") as metadata_file:
+            return json.load(metadata_file)
+    except FileNotFoundError:
+        return {}
@@ -0,0 +1,37 @@
+import time
+import importlib
+from typing import Dict
+import utils.objectboxDB.ob as ob
+from utils.functions.embeddings import get_client, get_tokenizer
+from utils.functions.faiss_search import get_faiss
+from utils.functions.partitions import build_missing_partitions
+
+
+def warm_up() -> Dict[str, Dict[str, float | str]]:
+    """
+    Initializes the store, clients, tokenizer and libraries that are otherwise loaded on first use,
+    and indexes the partitions uploaded before partitions existed.
+
+    A failing step doesn't stop the others, it is loaded again by the first request that needs it.
+
+    Returns:
+        Dict[str, Dict[str, float | str]]: The seconds spent on each step and the error of the failed ones.
+    """
+    steps = {
+        "objectbox_store": ob.get_text_chunk_box,
+        "openai_client": get_client,
+        "tokenizer": get_tokenizer,
+        "faiss": get_faiss,
+        "text_splitters": lambda: importlib.import_module("langchain_text_splitters"),
+        "missing_partitions": build_missing_partitions,
+    }
+
+    timings: Dict[str, Dict[str, float | str]] = {}
+    for name, step in steps.items():
+        start = time.perf_counter()
+        try:
+            step()
+            timings[name] = {"seconds": round(time.perf_counter() - start, 4)}
+        except Exception as e:
+            timings[name] = {"seconds": round(time.perf_counter() - start, 4), "error": str(e)}
+    return timings
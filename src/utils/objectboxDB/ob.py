@@ -1,3 +1,4 @@
+import threading
 from objectbox import *
 
 
@@ -24,12 +25,41 @@ class TextChunk:
     # Path of the chunk within the file
     path = String()
 
-    # Embedding of the chunk, used for vector searches
+    # L2-normalized embedding of the chunk, used for vector searches
     embedding = Float32Vector(index=HnswIndex(
         dimensions=1536,
         distance_type=VectorDistanceType.COSINE
     ))
 
 
-store = Store()
-text_chunk = store.box(TextChunk)
+_store = None
+_text_chunk = None
+_store_lock = threading.RLock()
+
+
+def get_store() -> Store:
+    """
+    Opens the ObjectBox store the first time it is needed instead of at import time.
+
+    Returns:
+        Store: The ObjectBox store.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = Store()
+        return _store
+
+
+def get_text_chunk_box() -> Box:
+    """
+    Returns the box of the text chunks, opening the store if needed.
+
+    Returns:
+        Box: The TextChunk box.
+    """
+    global _text_chunk
+    with _store_lock:
+        if _text_chunk is None:
+            _text_chunk = get_store().box(TextChunk)
+        return _text_chunk
@@ -1,10 +1,18 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
 class ComponentRequest(BaseModel):
     prompt: str
     replaces: Optional[str] = ""
+    repo_name: Optional[str] = None
+    branch: str = "main"
+
+
+class ComponentBatchRequest(BaseModel):
+    components: List[ComponentRequest] = Field(..., min_length=1, max_length=25,
+                                               description="The components to generate.")
+    use_cache: bool = Field(False, description="Reuse components already generated for the same prompt.")
 
 
 class GitHubRepository(BaseModel):